@@ -20,7 +20,8 @@ class Agent(object):
                  total_eps: int = 100000, 
                  noise_std: float = 0.2, 
                  tl_flag: bool = False, 
-                 extra_players: int = 0):
+                 extra_players: int = 0,
+                 use_compile: bool = False):
         """
         Initialize the agent with actor and critic networks.
         
@@ -39,6 +40,7 @@ class Agent(object):
             noise_std (float, optional): Standard deviation of exploration noise. Default is 0.2.
             tl_flag (bool, optional): Flag to enable transfer learning. Default is False.
             extra_players (int, optional): Number of additional players for transfer learning. Default is 0.
+            use_compile (bool, optional): Whether to compile the networks with torch.compile. Default is False.
         """
         self.gamma = gamma
         self.tau = tau
@@ -58,7 +60,27 @@ class Agent(object):
         self.target_critic = CriticNetwork(beta, input_dims, layer1_size, layer2_size, n_actions=n_actions,
                                            name='target_critic', n_agents=n_agents, flag=tl_flag, extra=extra_players)
 
+        self._target_params = list(self.target_critic.parameters()) + list(self.target_actor.parameters())
+        self._online_params = list(self.critic.parameters()) + list(self.actor.parameters())
         self.update_network_parameters(tau=1)
+
+        # Kept as a tensor so a changing noise decay does not trigger recompilation of _sample_actions
+        self._noise_scale = T.zeros((), device=self.actor.device)
+
+        # Fuse the small fixed-shape MLPs into compiled kernels. Off by default until a GPU run shows a gain.
+        if use_compile and hasattr(T, 'compile'):
+            # Every agent's networks share one forward code object, which dynamo compiles per network
+            # instance (2 actors per agent), grad mode (grad, no_grad, inference) and batch shape
+            # (static, then dynamic). Size its caches for all of them so none falls back to eager
+            variants = 2 * 3 * 2 * n_agents
+            dynamo_config = T._dynamo.config
+            dynamo_config.cache_size_limit = max(dynamo_config.cache_size_limit, variants)
+            dynamo_config.accumulated_cache_size_limit = max(dynamo_config.accumulated_cache_size_limit, variants)
+
+            self.actor, self.critic, self.target_actor, self.target_critic = (
+                T.compile(network, fullgraph=True)
+                for network in (self.actor, self.critic, self.target_actor, self.target_critic))
+            self._sample_actions = T.compile(self._sample_actions, fullgraph=True)
     
     def choose_action(self, observation: np.ndarray, episode: int, evaluation: bool = False) -> np.ndarray:
         """
@@ -72,18 +94,49 @@ class Agent(object):
         Returns:
             np.ndarray: The selected action.
         """
-        self.actor.eval()
-        obs_tensor = T.tensor([observation], dtype=T.float).to(self.actor.device)
-        action = self.actor.forward(obs_tensor).to(self.actor.device)
+        observation = np.asarray(observation, dtype=np.float32).reshape(1, -1)
+        return self.choose_actions_batched(observation, episode, evaluation)[0]
+
+    def choose_actions_batched(self, observations: np.ndarray, episode: int, evaluation: bool = False) -> np.ndarray:
+        """
+        Select actions for a batch of observations with a single forward pass of the actor.
         
+        Args:
+            observations (np.ndarray): Batch of observations, one per row.
+            episode (int): Current episode number, used for noise decay.
+            evaluation (bool, optional): If True, no exploration noise is added. Defaults is False.
+            
+        Returns:
+            np.ndarray: The selected actions, with shape (batch, n_actions).
+        """
+        obs = T.from_numpy(np.ascontiguousarray(observations, dtype=np.float32).reshape(len(observations), -1))
+        obs = obs.to(self.actor.device, non_blocking=True)
+
         if not evaluation:
-            noise = T.tensor(np.random.normal(0, self.noise_std), dtype=T.float).to(self.actor.device)
             decay = 1 - (episode / self.total_episodes)
-            action  += noise * decay
-            action  = action.clamp(0, 1)
+            self._noise_scale.fill_(self.noise_std * decay)
+
+        with T.inference_mode():
+            if evaluation:
+                actions = self.actor.forward(obs)
+            else:
+                actions = self._sample_actions(obs, self._noise_scale)
+
+        return actions.cpu().numpy()
 
-        self.actor.train()
-        return action.cpu().detach().numpy()
+    def _sample_actions(self, obs: T.Tensor, noise_scale: T.Tensor) -> T.Tensor:
+        """
+        Run the actor and add clipped Gaussian exploration noise, compiled as a single graph on GPU.
+        
+        Args:
+            obs (T.Tensor): Batch of observations on the actor's device.
+            noise_scale (T.Tensor): Scalar standard deviation of the noise.
+            
+        Returns:
+            T.Tensor: Noisy actions clamped to [0, 1].
+        """
+        mu = self.actor.forward(obs)
+        return (mu + T.randn_like(mu) * noise_scale).clamp_(0, 1)
 
     def update_network_parameters(self, tau: float|None=None) -> None:
         """
@@ -93,11 +146,8 @@ class Agent(object):
             tau (float, optional): Update parameter. If None, use the instance's tau value. Default is None.
         """
         if tau is None: tau = self.tau
-        for target_param, param in zip(self.target_critic.parameters(), self.critic.parameters()):
-            target_param.data.copy_(tau * param.data + (1 - tau) * target_param.data)
-
-        for target_param, param in zip(self.target_actor.parameters(), self.actor.parameters()):
-            target_param.data.copy_(tau * param.data + (1 - tau) * target_param.data)
+        with T.no_grad():
+            T._foreach_lerp_(self._target_params, self._online_params, tau)
         
     def save_models(self, name: str) -> None:
         """
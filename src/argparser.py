@@ -24,5 +24,8 @@ def load_args():
         config["transfer_learning"],
         config["extra_players"],
         config["executions"],
-        config["show_gui"]
+        config["show_gui"],
+        config["short_memory"],
+        config["seed"],
+        config["compile"]
     )
\ No newline at end of file
@@ -1,10 +1,13 @@
 import numpy as np
+import torch as T
 
 class ReplayBuffer(object):
     """
     Implements a replay buffer for storing agent interactions with the environment.
+    The memory lives on the training device, so sampled batches never cross the host-device boundary.
     """
-    def __init__(self, max_size: int, input_shape: int, n_actions: int, num_agents: int = 2) -> None:
+    def __init__(self, max_size: int, input_shape: int, n_actions: int, num_agents: int = 2,
+                 device: T.device | None = None) -> None:
         """
         Initialize the replay buffer with fixed-size memory for each component.
 
@@ -13,24 +16,29 @@ class ReplayBuffer(object):
             input_shape (int): Dimension of the state vector.
             n_actions (int): Dimension of the action vector.
             num_agents (int, optional): Total number of agents in the environment (default is 2).
+            device (T.device, optional): Device holding the memory. Defaults to the first GPU if available.
         """
         self.mem_size = max_size
         self.mem_cntr = 0
+        self._write_ptr = 0
+        self.device = device if device is not None else T.device('cuda:0' if T.cuda.is_available() else 'cpu')
 
-        self.state_memory = np.zeros((self.mem_size, input_shape))
-        self.action_memory = np.zeros((self.mem_size, n_actions))
-        self.reward_memory = np.zeros(self.mem_size)
+        self.state_memory = T.zeros((self.mem_size, input_shape), dtype=T.float32, device=self.device)
+        self.action_memory = T.zeros((self.mem_size, n_actions), dtype=T.float32, device=self.device)
+        self.reward_memory = T.zeros((self.mem_size, 1), dtype=T.float32, device=self.device)
 
-        self.others_states = np.zeros((self.mem_size, input_shape*(num_agents-1)))
-        self.others_actions = np.zeros((self.mem_size, n_actions*(num_agents-1)))
+        self.others_states = T.zeros((self.mem_size, input_shape*(num_agents-1)), dtype=T.float32, device=self.device)
+        self.others_actions = T.zeros((self.mem_size, n_actions*(num_agents-1)), dtype=T.float32, device=self.device)
 
-    def get_values(self, idx: int | list) -> tuple:
+        self._batch = T.empty(0, dtype=T.long, device=self.device)
+
+    def get_values(self, idx: int | T.Tensor) -> tuple:
         """
         Retrieves the stored values (states, actions, rewards, others_states, others_actions) 
         from memory at the specified indice.
 
         Args:
-            idx (int or list): The indices of the values to retrieve.
+            idx (int or T.Tensor): The indices of the values to retrieve.
 
         Returns:
             tuple: A tuple containing states, actions, rewards, others_states and others_actions.
@@ -44,7 +52,7 @@ class ReplayBuffer(object):
 
         return states, actions, rewards, others_states, others_actions
 
-    def store_transition(self, state: np.ndarray, action: np.ndarray, reward: float, others_states: np.ndarray, 
+    def store_transition(self, state: np.ndarray, action: np.ndarray, reward: float | T.Tensor, others_states: np.ndarray, 
                          others_actions: np.ndarray) -> None:
         """
         Stores state, action, reward, others_states and others_actions in the memory buffer.
@@ -52,19 +60,21 @@ class ReplayBuffer(object):
         Args:
             state (np.ndarray): Current agent's observation.
             action (np.ndarray): Current agent's action.
-            reward (float): Reward received after taking the action.
+            reward (float or T.Tensor): Reward received after taking the action.
             others_states (np.ndarray): Concatenated observations of other agents.
             others_actions (np.ndarray): Concatenated actions of other agents.
 
+        The write pointer wraps around once the memory is full, overwriting the oldest transitions.
         The memory counter is updated after storing the transition.
         """
-        index = self.mem_cntr % self.mem_size
-        self.state_memory[index] = state
-        self.action_memory[index] = action
-        self.reward_memory[index] = reward
-
-        self.others_states[index] = others_states
-        self.others_actions[index] = others_actions
+        index = self._write_ptr
+        self.state_memory[index].copy_(T.from_numpy(np.asarray(state, dtype=np.float32)))
+        self.action_memory[index].copy_(T.from_numpy(np.asarray(action, dtype=np.float32)))
+        self.reward_memory[index, 0].copy_(T.as_tensor(reward))
+
+        self.others_states[index].copy_(T.from_numpy(np.asarray(others_states, dtype=np.float32)))
+        self.others_actions[index].copy_(T.from_numpy(np.asarray(others_actions, dtype=np.float32)))
+        self._write_ptr = index + 1 if index + 1 < self.mem_size else 0
         self.mem_cntr += 1
 
     def sample_buffer(self, batch_size: int) -> tuple:
@@ -78,8 +88,10 @@ class ReplayBuffer(object):
             tuple: The set of values sampled, which is limited by mem_cntr or mem_size.
         """
         max_mem = min(self.mem_cntr, self.mem_size)
-        batch = np.random.choice(max_mem, batch_size)
-    
+        if len(self._batch) != batch_size:
+            self._batch = T.empty(batch_size, dtype=T.long, device=self.device)
+        batch = T.randint(max_mem, (batch_size,), out=self._batch)
+
         return self.get_values(batch)
     
     def sample_last_buffer(self, batch_size: int) -> tuple:
@@ -94,4 +106,4 @@ class ReplayBuffer(object):
         """
         if self.mem_cntr < batch_size: batch_size = self.mem_cntr 
 
-        return self.get_values(range(self.mem_cntr-batch_size, self.mem_cntr))
\ No newline at end of file
+        return self.get_values(T.arange(self.mem_cntr-batch_size, self.mem_cntr, device=self.device))
\ No newline at end of file
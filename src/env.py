@@ -1,5 +1,5 @@
-import random
 import numpy as np
+import torch as T
 from gym import Env
 from gym.spaces import Box
 
@@ -11,7 +11,7 @@ class BaseAuctionEnv(Env):
     """
     Implement a base auction environment.
     """
-    def __init__(self, n_players:int, bid_dim:int=1, obs_dim:int=1):
+    def __init__(self, n_players:int, bid_dim:int=1, obs_dim:int=1, seed:int|None=None):
         """
         Initialize the auction environment.
 
@@ -19,11 +19,15 @@ class BaseAuctionEnv(Env):
             n_players (int): Number of players participating in the auction.
             bid_dim (int): Dimension of the bid of each player.
             obs_dim (int): Dimension of the observation space for each player.
+            seed (int, optional): Seed of the generator used to draw private values.
         """
         self.n_players = n_players
+        self._rng = np.random.default_rng(seed)
+        self._values = np.empty(n_players, dtype=np.float32)
         self.bid_space = Box(low=np.zeros(bid_dim), high=np.ones(bid_dim), dtype=np.float32)
         self.observation_space = Box(low=np.zeros(obs_dim), high=np.ones(obs_dim), dtype=np.float32)
         self.states_shape = self.observation_space.shape
+        self._rewards = np.zeros(n_players, dtype=np.float32)
 
 class MAFirstPriceAuctionEnv(BaseAuctionEnv):
     """
@@ -31,55 +35,59 @@ class MAFirstPriceAuctionEnv(BaseAuctionEnv):
     The highest bidder wins the item and pays the amount they bid.
     All other bidders pay nothing and receive no reward.
     """
-    def __init__(self, n_players: int) -> None:
+    def __init__(self, n_players: int, seed: int | None = None) -> None:
         """
         Initialize the first-price auction environment.
 
         Args:
             n_players (int): Number of players participating in the auction.
+            seed (int, optional): Seed of the generator used to draw private values.
         """
-        super().__init__(n_players)
+        super().__init__(n_players, seed=seed)
 
-    def reward_n_players(self, values: list, bids: list, r: float, t: float) -> list:
+    def reward_n_players(self, values: np.ndarray, bids: np.ndarray, r: float, t: float) -> np.ndarray:
         """
         Calculate rewards for all players based on their private values and bids.
         
         Args:
-            values (list): Private values for each player.
-            bids (list): Bids made by each player.
+            values (np.ndarray): Private values for each player.
+            bids (np.ndarray): Bids made by each player.
             r (float): Risk adjustment parameter.
         
         Returns:
-            list: Rewards for each player. Only the winner gets a non-zero reward.
+            np.ndarray: Rewards for each player. Only the winner gets a non-zero reward.
+                The array is reused by the next call.
         """
-        rewards = [0] * self.n_players
-        idx = np.argmax(bids)
+        bids = np.asarray(bids)
+        self._rewards.fill(0)
+        idx = int(bids.argmax())
         winner_reward = values[idx] - bids[idx]
-        rewards[idx] = winner_reward**r if winner_reward > 0 else winner_reward
-        return rewards
+        self._rewards[idx] = winner_reward**r if winner_reward > 0 else winner_reward
+        return self._rewards
 
-    def step(self, states: list, actions: list, r: float, t: float) -> list:
+    def step(self, states: np.ndarray, actions: np.ndarray, r: float, t: float) -> np.ndarray:
         """
         Execute a step in the environment.
         
         Args:
-            states (list): Private values for each player.
-            actions (list): Bids made by each player.
+            states (np.ndarray): Private values for each player.
+            actions (np.ndarray): Bids made by each player.
             r (float): Risk adjustment parameter.
         
         Returns:
-            list: Rewards for each player.
+            np.ndarray: Rewards for each player.
         """
         return self.reward_n_players(states, actions, r, t)
 
-    def reset(self) -> list:
+    def reset(self) -> np.ndarray:
         """
         Reset the environment, generating new random private values for each player.
         
         Returns:
-            list: New private values for each player, uniformly sampled from [0,1].
+            np.ndarray: New private values for each player, uniformly sampled from [0,1].
+                The array is reused by the next reset.
         """
-        return [random.random() for _ in range(self.n_players)]
+        return self._rng.random(self.n_players, dtype=np.float32, out=self._values)
 
 class MASecondPriceAuctionEnv(BaseAuctionEnv):
     """
@@ -87,57 +95,59 @@ class MASecondPriceAuctionEnv(BaseAuctionEnv):
     and pays the second-highest bid, receiving a reward based on the difference between 
     their private value and the second-highest bid.
     """
-    def __init__(self, n_players: int) -> None:
+    def __init__(self, n_players: int, seed: int | None = None) -> None:
         """
         Initialize the second-price auction environment.
 
         Args:
             n_players (int): Number of players participating in the auction.
+            seed (int, optional): Seed of the generator used to draw private values.
         """
-        super().__init__(n_players)
+        super().__init__(n_players, seed=seed)
 
-    def reward_n_players(self, values: list, bids: list, r: float, t: float) -> list:
+    def reward_n_players(self, values: np.ndarray, bids: np.ndarray, r: float, t: float) -> np.ndarray:
         """
         Calculate the rewards for all players based on their bids and private values.
         The player with the highest bid wins the auction but pays the second-highest bid.
 
         Args:
-            values (list): Private values for each player.
-            bids (list): Bids submitted by each player.
+            values (np.ndarray): Private values for each player.
+            bids (np.ndarray): Bids submitted by each player.
             r (float): Risk adjustment parameter.
 
         Returns:
-            list: Rewards assigned to each player.
+            np.ndarray: Rewards assigned to each player. The array is reused by the next call.
         """
-        rewards = [0] * self.n_players
-        idxs = np.argsort(bids)[-2:]
-        max_idx, second_max_idx = idxs[1], idxs[0]
+        bids = np.asarray(bids)
+        self._rewards.fill(0)
+        # argpartition leaves the largest bid last and the second largest right before it
+        second_max_idx, max_idx = np.argpartition(bids, -2)[-2:]
         winner_reward = values[max_idx] - bids[second_max_idx]
-        rewards[max_idx] = winner_reward**r if winner_reward > 0 else winner_reward
-        return rewards
+        self._rewards[max_idx] = winner_reward**r if winner_reward > 0 else winner_reward
+        return self._rewards
 
-    def step(self, states: list, actions: list, r: float, t: float) -> list:
+    def step(self, states: np.ndarray, actions: np.ndarray, r: float, t: float) -> np.ndarray:
         """
         Execute a step in the environment.
 
         Args:
-            states (list): Private values for each player.
-            actions (list): Bids submitted by each player.
+            states (np.ndarray): Private values for each player.
+            actions (np.ndarray): Bids submitted by each player.
             r (float): Risk adjustment parameter.
 
         Returns:
-            list: Rewards for each player.
+            np.ndarray: Rewards for each player.
         """
         return self.reward_n_players(states, actions, r, t)
 
-    def reset(self) -> list:
+    def reset(self) -> np.ndarray:
         """
         Reset the environment by generating new private values for each player.
 
         Returns:
-            list: New private values for each player.
+            np.ndarray: New private values for each player. The array is reused by the next reset.
         """
-        return [random.random() for _ in range(self.n_players)]
+        return self._rng.random(self.n_players, dtype=np.float32, out=self._values)
 
 
 class MATariffDiscountEnv(BaseAuctionEnv):
@@ -146,58 +156,61 @@ class MATariffDiscountEnv(BaseAuctionEnv):
     and receives a reward based on the difference between maximum revenue and 
     their bid, adjusted by their costs.
     """
-    def __init__(self, n_players: int, max_revenue: float) -> None:
+    def __init__(self, n_players: int, max_revenue: float, seed: int | None = None) -> None:
         """
         Initialize the tariff discount auction environment.
 
         Args:
             n_players (int): Number of players participating in the auction.
             max_revenue (float): Maximum revenue that can be achieved in the auction.
+            seed (int, optional): Seed of the generator used to draw private costs.
         """
-        super().__init__(n_players)
+        super().__init__(n_players, seed=seed)
         self.max_revenue = max_revenue
 
-    def reward_n_players(self, costs: list, bids: list, r: float) -> list:
+    def reward_n_players(self, costs: np.ndarray, bids: np.ndarray, r: float) -> np.ndarray:
         """
         Calculate the rewards for all players based on their bids and private costs.
         The player with the highest bid wins the auction. 
 
         Args:
-            costs (list): Private costs for each player.
-            bids (list): Bids submitted by each player.
+            costs (np.ndarray): Private costs for each player.
+            bids (np.ndarray): Bids submitted by each player.
             r (float): Risk adjustment parameter.
 
         Returns:
-            list: Rewards assigned to each player.
+            np.ndarray: Rewards assigned to each player. The array is reused by the next call.
         """
-        rewards = [0] * self.n_players
-        idx = np.argmax(bids)
+        bids = np.asarray(bids)
+        self._rewards.fill(0)
+        idx = int(bids.argmax())
         winner_reward = self.max_revenue * (1 - bids[idx]) - costs[idx]
-        rewards[idx] = winner_reward**r if winner_reward > 0 else winner_reward
-        return rewards
+        self._rewards[idx] = winner_reward**r if winner_reward > 0 else winner_reward
+        return self._rewards
 
-    def step(self, states: list, actions: list, r: float) -> list:
+    def step(self, states: np.ndarray, actions: np.ndarray, r: float) -> np.ndarray:
         """
         Execute a step in the environment.
 
         Args:
-            states (list): Private cost values for each player.
-            actions (list): Bids submitted by each player.
+            states (np.ndarray): Private cost values for each player.
+            actions (np.ndarray): Bids submitted by each player.
 
         Returns:
-            list: Rewards for each player.
+            np.ndarray: Rewards for each player.
         """
         return self.reward_n_players(states, actions, r)
 
-    def reset(self) -> list:
+    def reset(self) -> np.ndarray:
         """
         Reset the environment by generating new private cost values for each player.
         Each cost is randomly sampled from a uniform distribution in the range [0, max_revenue].
 
         Returns:
-            list: New private costs for each player.
+            np.ndarray: New private costs for each player. The array is reused by the next reset.
         """
-        return [random.random() * self.max_revenue for _ in range(self.n_players)]
+        self._rng.random(self.n_players, dtype=np.float32, out=self._values)
+        return np.multiply(self._values, self.max_revenue, out=self._values, casting='unsafe')
 
 
 class MAAllPayAuctionEnv(BaseAuctionEnv):
@@ -206,56 +219,58 @@ class MAAllPayAuctionEnv(BaseAuctionEnv):
     All participants must pay their bids regardless of whether they win 
     or not, but only the highest bidder wins the item.
     """
-    def __init__(self, n_players: int) -> None:
+    def __init__(self, n_players: int, seed: int | None = None) -> None:
         """
         Initialize the all-pay auction environments.
         
         Args:
             n_players (int): Number of players participating in the auction.
+            seed (int, optional): Seed of the generator used to draw private values.
         """
-        super().__init__(n_players)
+        super().__init__(n_players, seed=seed)
 
-    def reward_n_players(self, values: list, bids: list, r: float, t: float) -> list:
+    def reward_n_players(self, values: np.ndarray, bids: np.ndarray, r: float, t: float) -> np.ndarray:
         """
         Calculate the reward of all players based on their private values and bids.
         
         Args:
-            values (list): Private value of each player.
-            bids (list): Bids made by each player.
+            values (np.ndarray): Private value of each player.
+            bids (np.ndarray): Bids made by each player.
             r (float): Risk adjustment parameter.
         
         Returns:
-            list: Reward of each player.
+            np.ndarray: Reward of each player. The array is reused by the next call.
         """
         alpha = 0.1
-        rewards = [-b - alpha for b in bids]
-        idx = np.argmax(bids)
+        bids = np.asarray(bids)
+        np.subtract(-alpha, bids, out=self._rewards, casting='unsafe')
+        idx = int(bids.argmax())
         winner_reward = values[idx] - bids[idx]
-        rewards[idx] = winner_reward**r if winner_reward > 0 else winner_reward
-        return rewards
+        self._rewards[idx] = winner_reward**r if winner_reward > 0 else winner_reward
+        return self._rewards
 
-    def step(self, states: list, actions: list, r: float, t: float) -> list:
+    def step(self, states: np.ndarray, actions: np.ndarray, r: float, t: float) -> np.ndarray:
         """
         Execute a step in the environment.
         
         Args:
-            states (list): Private values of each player.
-            actions (list): Bids made by each player.
+            states (np.ndarray): Private values of each player.
+            actions (np.ndarray): Bids made by each player.
             r (float): Risk adjustment parameter.
         
         Returns:
-            list: Reward of each player.
+            np.ndarray: Reward of each player.
         """
         return self.reward_n_players(states, actions, r, t)
 
-    def reset(self) -> list:
+    def reset(self) -> np.ndarray:
         """
         Reset the environment, generating new random private values for each player.
         
         Returns:
-            list: New private values.
+            np.ndarray: New private values. The array is reused by the next reset.
         """
-        return [random.random() for _ in range(self.n_players)]
+        return self._rng.random(self.n_players, dtype=np.float32, out=self._values)
 
 
 class MAPartialAllPayAuctionEnv(BaseAuctionEnv):
@@ -265,21 +280,22 @@ class MAPartialAllPayAuctionEnv(BaseAuctionEnv):
     - t = 1: All-Pay Auction
     - 0 < t < 1: Hybrid Auction
     '''
-    def __init__(self, n_players):
-        super().__init__(n_players)
+    def __init__(self, n_players, seed=None):
+        super().__init__(n_players, seed=seed)
 
     def reward_n_players(self, values, bids, r, t):
-        rewards = [-b*t for b in bids]
-        idx = np.argmax(bids)
+        bids = np.asarray(bids)
+        np.multiply(bids, -t, out=self._rewards, casting='unsafe')
+        idx = int(bids.argmax())
         winner_reward = values[idx] - bids[idx]
-        rewards[idx] = winner_reward**r if winner_reward > 0 else winner_reward
-        return rewards
+        self._rewards[idx] = winner_reward**r if winner_reward > 0 else winner_reward
+        return self._rewards
 
     def step(self, states, actions, r, t):
         return self.reward_n_players(states, actions, r, t)
     
     def reset(self):
-        return [random.random() for _ in range(self.n_players)]
+        return self._rng.random(self.n_players, dtype=np.float32, out=self._values)
 
 class MAScoreAuctionEnv(Env):
     """
@@ -289,8 +305,9 @@ class MAScoreAuctionEnv(Env):
     - Score = effort - bid
     - Reward = value - bid - effort * cost
     """
-    def __init__(self, n_players):
+    def __init__(self, n_players, seed=None):
         self.n_players = n_players
+        self._rng = np.random.default_rng(seed)
         self.bid_space = Box(low=np.array([0, 0]), high=np.array([1, 1]), dtype=np.float32)
         self.observation_space = Box(low=np.array([0, 0]), high=np.array([1, 1]), dtype=np.float32)
         self.states_shape = (self.n_players, 2)
@@ -311,4 +328,144 @@ class MAScoreAuctionEnv(Env):
         return self.reward_n_players(states, actions)
 
     def reset(self):
-        return [(random.random(), random.random()) for _ in range(self.n_players)]
\ No newline at end of file
+        return self._rng.random((self.n_players, 2))
+
+
+class BaseBatchedAuctionEnv:
+    """
+    Implement a base environment that plays a batch of independent auctions at once.
+    Values, bids and rewards are tensors of shape (batch_size, n_players) kept on one device.
+    """
+    def __init__(self, n_players: int, device: T.device | None = None) -> None:
+        """
+        Initialize the batched auction environment.
+
+        Args:
+            n_players (int): Number of players participating in each auction.
+            device (T.device, optional): Device holding the tensors. Defaults to the first GPU if available.
+        """
+        self.n_players = n_players
+        self.device = device if device is not None else T.device('cuda:0' if T.cuda.is_available() else 'cpu')
+
+    def _risk_adjust(self, winner_reward: T.Tensor, r: float) -> T.Tensor:
+        """
+        Apply the risk adjustment to the winners' rewards, keeping losses unchanged.
+        """
+        return T.where(winner_reward > 0, winner_reward.clamp(min=0)**r, winner_reward)
+
+    def step(self, values: T.Tensor, bids: T.Tensor, r: float, t: float = 1) -> T.Tensor:
+        """
+        Execute a step in every auction of the batch.
+
+        Args:
+            values (T.Tensor): Private values, with shape (batch_size, n_players).
+            bids (T.Tensor): Bids, with shape (batch_size, n_players).
+            r (float): Risk adjustment parameter.
+
+        Returns:
+            T.Tensor: Rewards, with shape (batch_size, n_players).
+        """
+        return self.reward_n_players(values, bids, r, t)
+
+    def reset(self, batch_size: int) -> T.Tensor:
+        """
+        Generate new private values for every auction of the batch.
+
+        Args:
+            batch_size (int): Number of auctions to simulate.
+
+        Returns:
+            T.Tensor: Private values uniformly sampled from [0,1], with shape (batch_size, n_players).
+        """
+        return T.rand((batch_size, self.n_players), device=self.device)
+
+
+class BatchedFirstPriceEnv(BaseBatchedAuctionEnv):
+    """
+    Batched version of MAFirstPriceAuctionEnv.
+    """
+    def reward_n_players(self, values: T.Tensor, bids: T.Tensor, r: float, t: float) -> T.Tensor:
+        """
+        Calculate the rewards of every auction in the batch. The highest bidder of each
+        auction wins the item and pays the amount they bid.
+
+        Args:
+            values (T.Tensor): Private values, with shape (batch_size, n_players).
+            bids (T.Tensor): Bids, with shape (batch_size, n_players).
+            r (float): Risk adjustment parameter.
+
+        Returns:
+            T.Tensor: Rewards, with shape (batch_size, n_players). Only the winners get a non-zero reward.
+        """
+        idx = bids.argmax(dim=1, keepdim=True)
+        winner_reward = values.gather(1, idx) - bids.gather(1, idx)
+        return T.zeros_like(bids).scatter_(1, idx, self._risk_adjust(winner_reward, r))
+
+
+class BatchedSecondPriceEnv(BaseBatchedAuctionEnv):
+    """
+    Batched version of MASecondPriceAuctionEnv.
+    """
+    def reward_n_players(self, values: T.Tensor, bids: T.Tensor, r: float, t: float) -> T.Tensor:
+        """
+        Calculate the rewards of every auction in the batch. The highest bidder of each
+        auction wins the item but pays the second-highest bid.
+
+        Args:
+            values (T.Tensor): Private values, with shape (batch_size, n_players).
+            bids (T.Tensor): Bids, with shape (batch_size, n_players).
+            r (float): Risk adjustment parameter.
+
+        Returns:
+            T.Tensor: Rewards, with shape (batch_size, n_players). Only the winners get a non-zero reward.
+        """
+        top_bids, top_idxs = T.topk(bids, 2, dim=1)
+        idx = top_idxs[:, :1]
+        winner_reward = values.gather(1, idx) - top_bids[:, 1:]
+        return T.zeros_like(bids).scatter_(1, idx, self._risk_adjust(winner_reward, r))
+
+
+class BatchedAllPayEnv(BaseBatchedAuctionEnv):
+    """
+    Batched version of MAAllPayAuctionEnv.
+    """
+    def reward_n_players(self, values: T.Tensor, bids: T.Tensor, r: float, t: float) -> T.Tensor:
+        """
+        Calculate the rewards of every auction in the batch. Every player pays their bid,
+        but only the highest bidder of each auction wins the item.
+
+        Args:
+            values (T.Tensor): Private values, with shape (batch_size, n_players).
+            bids (T.Tensor): Bids, with shape (batch_size, n_players).
+            r (float): Risk adjustment parameter.
+
+        Returns:
+            T.Tensor: Rewards, with shape (batch_size, n_players).
+        """
+        alpha = 0.1
+        idx = bids.argmax(dim=1, keepdim=True)
+        winner_reward = values.gather(1, idx) - bids.gather(1, idx)
+        return (-bids - alpha).scatter_(1, idx, self._risk_adjust(winner_reward, r))
+
+
+class BatchedPartialAllPayEnv(BaseBatchedAuctionEnv):
+    """
+    Batched version of MAPartialAllPayAuctionEnv.
+    """
+    def reward_n_players(self, values: T.Tensor, bids: T.Tensor, r: float, t: float) -> T.Tensor:
+        """
+        Calculate the rewards of every auction in the batch. The losers pay a fraction t
+        of their bids, and the highest bidder of each auction wins the item.
+
+        Args:
+            values (T.Tensor): Private values, with shape (batch_size, n_players).
+            bids (T.Tensor): Bids, with shape (batch_size, n_players).
+            r (float): Risk adjustment parameter.
+            t (float): Fraction of the bid paid by the losers.
+
+        Returns:
+            T.Tensor: Rewards, with shape (batch_size, n_players).
+        """
+        idx = bids.argmax(dim=1, keepdim=True)
+        winner_reward = values.gather(1, idx) - bids.gather(1, idx)
+        return (-bids * t).scatter_(1, idx, self._risk_adjust(winner_reward, r))
@@ -39,8 +39,7 @@ def get_all_bids_except(agents: list, k: int, n_bids: int) -> list:
     others_bids = []
     for j in range(len(agents)):
         if j != k:
-            bids = [agents[j].choose_action(np.random.random(), 0, evaluation=True)[0] 
-                    for _ in range(n_bids)]
+            bids = agents[j].choose_actions_batched(np.random.random(n_bids), 0, evaluation=True)[:, 0].tolist()
             others_bids.append(bids)
     return others_bids
     
@@ -1,5 +1,6 @@
 from env import *
 import numpy as np
+import torch as T
 from utils import *
 from train import *
 from evaluation import *
@@ -24,7 +25,10 @@ class AuctionSimulationRunner:
                  tl: bool, 
                  extra_players: int, 
                  z: float, 
-                 gui: bool):
+                 gui: bool,
+                 short_memory: bool = True,
+                 seed: int | None = None,
+                 use_compile: bool = False):
         """
         Initialize the simulation runner with configuration parameters.
 
@@ -43,6 +47,9 @@ class AuctionSimulationRunner:
             tl (bool): Enable transfer learning.
             extra_players (int): Number of agents to add incrementally via transfer learning.
             z (float): Additional parameter for flexibility.
+            short_memory (bool, optional): Whether to run a second update on the most recent transition. Defaults is True.
+            seed (int, optional): Seed of the environments' private value generators. Defaults is None.
+            use_compile (bool, optional): Whether to compile the networks with torch.compile. Defaults is False.
         """
         self.auction = auction
         self.target_auction = target_auction
@@ -61,6 +68,9 @@ class AuctionSimulationRunner:
         self.extra_players = extra_players
         self.z = z
         self.gui = gui
+        self.short_memory = short_memory
+        self.seed = seed
+        self.use_compile = use_compile
         self.max_revenue = 3 if auction == 'tariff_discount' else None
 
     def create_env(self, N: int):
@@ -77,13 +87,37 @@ class AuctionSimulationRunner:
             ValueError: If the auction type is not recognized.
         """
         if self.auction == 'first_price':
-            return MAFirstPriceAuctionEnv(N)
+            return MAFirstPriceAuctionEnv(N, seed=self.seed)
         elif self.auction == 'second_price':
-            return MASecondPriceAuctionEnv(N)
+            return MASecondPriceAuctionEnv(N, seed=self.seed)
         elif self.auction == 'all_pay':
-            return MAAllPayAuctionEnv(N)
+            return MAAllPayAuctionEnv(N, seed=self.seed)
         elif self.auction == 'partial_all_pay':
-            return MAPartialAllPayAuctionEnv(N)
+            return MAPartialAllPayAuctionEnv(N, seed=self.seed)
+        else:
+            raise ValueError(f"Auction type '{self.auction}' not recognized.")
+
+    def create_batched_env(self, N: int):
+        """
+        Create and return the batched version of the auction environment, used to probe grid bids.
+
+        Args:
+            N (int): Number of agents in the environment.
+
+        Returns:
+            Batched auction environment instance.
+
+        Raises:
+            ValueError: If the auction type is not recognized.
+        """
+        if self.auction == 'first_price':
+            return BatchedFirstPriceEnv(N)
+        elif self.auction == 'second_price':
+            return BatchedSecondPriceEnv(N)
+        elif self.auction == 'all_pay':
+            return BatchedAllPayEnv(N)
+        elif self.auction == 'partial_all_pay':
+            return BatchedPartialAllPayEnv(N)
         else:
             raise ValueError(f"Auction type '{self.auction}' not recognized.")
 
@@ -121,18 +155,24 @@ class AuctionSimulationRunner:
         - If `trained=True`: loads saved models for evaluation.
         - If transfer learning is enabled, adds agents one at a time and retrains with knowledge transfer.
         """
+        # Network weights are drawn before MAtrainLoop seeds its generators
+        if self.seed is not None:
+            T.manual_seed(self.seed)
+
         # Create initial environment and agents
         env = self.create_env(self.n_players)
         maddpg = MADDPG(alpha=0.000025, beta=0.00025, input_dims=1, tau=0.001,
                         gamma=0.99, BS=self.batch_size, fc1=100, fc2=100, n_actions=1,
                         n_agents=self.n_players, total_eps=self.n_episodes, noise_std=0.2,
-                        tl_flag=self.tl, extra_players=self.extra_players)
+                        tl_flag=self.tl, extra_players=self.extra_players,
+                        use_short_memory=self.short_memory, use_compile=self.use_compile)
 
         if not self.trained:
             print('Training models...')
             MAtrainLoop(maddpg, env, self.n_episodes, self.auction, t=self.t,
                         r=self.aversion_coef, gif=self.create_gif,
-                        save_interval=50, tl_flag=self.tl, extra_players=self.extra_players, show_gui=self.gui)
+                        save_interval=50, tl_flag=self.tl, extra_players=self.extra_players, show_gui=self.gui,
+                        batched_env=self.create_batched_env(self.n_players))
             
             if self.tl and self.extra_players == 0:
                 self.auction = self.target_auction
@@ -140,7 +180,8 @@ class AuctionSimulationRunner:
                 env = self.create_env(self.n_players)
                 MAtrainLoop(maddpg, env, self.n_episodes, self.auction,
                             t=self.t, r=self.aversion_coef, gif=self.create_gif,
-                            save_interval=50, tl_flag=self.tl, extra_players=self.extra_players, show_gui=self.gui)
+                            save_interval=50, tl_flag=self.tl, extra_players=self.extra_players, show_gui=self.gui,
+                            batched_env=self.create_batched_env(self.n_players))
 
         if self.tl:
             for i in range(self.extra_players):
@@ -155,7 +196,8 @@ class AuctionSimulationRunner:
                 maddpg = MADDPG(alpha=0.000025, beta=0.00025, input_dims=1, tau=0.001,
                                 gamma=0.99, BS=self.batch_size, fc1=100, fc2=100, n_actions=1,
                                 n_agents=new_N, total_eps=self.n_episodes, noise_std=0.2,
-                                tl_flag=tl_flag_iter, extra_players=extra_left)
+                                tl_flag=tl_flag_iter, extra_players=extra_left,
+                                use_short_memory=self.short_memory, use_compile=self.use_compile)
 
                 for k in range(prev_N):
                     model_name = f"{self.auction}_N_{prev_N}_ag{k}_r{self.aversion_coef}_{self.n_episodes}ep"
@@ -166,7 +208,8 @@ class AuctionSimulationRunner:
                 env = self.create_env(new_N)
                 MAtrainLoop(maddpg, env, self.n_episodes, self.auction,
                             r=self.aversion_coef, gif=self.create_gif,
-                            save_interval=50, tl_flag=tl_flag_iter, extra_players=extra_left)
+                            save_interval=50, tl_flag=tl_flag_iter, extra_players=extra_left,
+                            batched_env=self.create_batched_env(new_N))
                 
         if self.trained and not self.tl: # Evaluation phase
             print('Evaluating models...')
@@ -1,9 +1,9 @@
 import torch as T
-import numpy as np
 import torch.nn.functional as F
 
 from agent import Agent
 from buffer import ReplayBuffer
+from networks import ActorNetwork
 
 class MADDPG:
     """
@@ -26,6 +26,8 @@ class MADDPG:
     - noise_std (float): standard deviation of Gaussian noise for exploration.
     - tl_flag (bool): boolean flag for transfer learning.
     - extra_players (int): number of "ghost" agents to be added.
+    - use_short_memory (bool): whether to run a second update on the most recent transition.
+    - use_compile (bool): whether to compile the agents' networks with torch.compile.
     """
     
     def __init__(self,
@@ -42,37 +44,35 @@ class MADDPG:
                  total_eps: int=100000, 
                  noise_std: float=0.2, 
                  tl_flag: bool=False, 
-                 extra_players: int=0):
+                 extra_players: int=0,
+                 use_short_memory: bool=True,
+                 use_compile: bool=False):
+        # Network shapes stay fixed for the whole run, and TF32 rounding is far below the policy-gradient noise
+        T.backends.cudnn.benchmark = True
+        T.backends.cuda.matmul.allow_tf32 = True
+        T.backends.cudnn.allow_tf32 = True
+        T.set_float32_matmul_precision('high')
+
         self.agents = []
         self.num_agents = n_agents
+        self.n_actions = n_actions
         for _ in range(n_agents):
             self.agents.append(Agent(alpha=alpha, beta=beta, input_dims=input_dims, 
                                      tau=tau, batch_size=BS, layer1_size=fc1, 
                                      layer2_size=fc2, n_agents=self.num_agents,
                                      n_actions=n_actions, total_eps=total_eps, 
                                      noise_std=noise_std, tl_flag=tl_flag,
-                                     extra_players=extra_players))
+                                     extra_players=extra_players, use_compile=use_compile))
             
+        self._others_idx = [tuple(j for j in range(n_agents) if j != i) for i in range(n_agents)]
         self.batch_size = BS
         self.gamma = gamma
         self.max_size = 1000000
-        self.memory = ReplayBuffer(self.max_size, input_dims, n_actions, self.num_agents)
-        self.short_memory = ReplayBuffer(1, input_dims, n_actions, self.num_agents)
-
-    def _create_ghosts(self, array: np.ndarray, num_tiles: int) -> np.ndarray:
-        """
-        Adds ghost agents by replicating the first column of the input array multiple times.
-
-        Args:
-            array (np.ndarray): Array of shape (batch_size, num_agents - 1)
-            num_tiles (int): Number of ghost agents to append
-
-        Returns:
-            np.ndarray: Extended array with ghost agent columns
-        """
-        first_column = np.expand_dims(array[:, 0], axis=1)
-        tiled = np.tile(first_column, (1, num_tiles))
-        return np.concatenate([array, tiled], axis=1)
+        device = self.agents[0].critic.device
+        self.memory = ReplayBuffer(self.max_size, input_dims, n_actions, self.num_agents, device)
+        self.use_short_memory = use_short_memory
+        self.short_memory = ReplayBuffer(1, input_dims, n_actions, self.num_agents, device) if use_short_memory else None
+        self._blocks = {}
 
     def _get_others_actions(self, idx: int, others_states: T.tensor, network: str='target_actor') -> T.tensor:
         """
@@ -86,17 +86,37 @@ class MADDPG:
         Returns:
             Tensor: Concatenated actions from other agents
         """
-        indexes = list(range(self.num_agents))
-        indexes.remove(idx)
-        actions = []
-        for i in range(len(indexes)):
-            state_col = others_states[:, i].reshape(-1, 1)
-            agent_net = getattr(self.agents[indexes[i]], network)
-            actions.append(agent_net.forward(state_col))
-        return T.cat(actions, dim=1)
+        networks = [getattr(self.agents[j], network) for j in self._others_idx[idx]]
+        if len(networks) == 1:
+            return networks[0].forward(others_states)
+
+        # Up to 4 other agents, one forward through their block-diagonal layers is cheaper than a
+        # forward per agent, even though it multiplies the work by the number of agents. The layers
+        # are rebuilt only when an update or a checkpoint load bumps one of the parameters' versions,
+        # which while one agent learns happens to none of the others. The combined layers carry no
+        # gradients, so they only serve calls made without them, such as the target actions
+        if len(networks) <= 4 and not T.is_grad_enabled():
+            key = (idx, network)
+            if key not in self._blocks:
+                self._blocks[key] = ([param for net in networks for param in net.parameters()], None, None)
+            params, versions, layers = self._blocks[key]
+            current = [param._version for param in params]
+            if current != versions:
+                layers = ActorNetwork.block_diagonal_layers(networks)
+                self._blocks[key] = (params, current, layers)
+            return ActorNetwork.block_diagonal_forward(layers, others_states)
+
+        # With more agents the extra work dominates, so each actor runs separately and writes its
+        # actions straight into its slice of the output instead of going through a list and cat
+        n_actions = self.n_actions
+        actions = others_states.new_empty(others_states.shape[0], len(networks) * n_actions)
+        for i, net in enumerate(networks):
+            actions[:, i * n_actions:(i + 1) * n_actions] = net.forward(others_states[:, i:i + 1])
+        return actions
 
     def _train_critic(self, agent, state: T.tensor, action: T.tensor, reward: T.tensor, others_states: T.tensor, 
-                      others_actions: T.tensor, target_actions: T.tensor, others_target_actions: T.tensor) -> None:
+                      others_actions: T.tensor, target_actions: T.tensor, others_target_actions: T.tensor,
+                      num_tiles: int) -> None:
         """
         Trains the critic network of a given agent.
 
@@ -108,23 +128,22 @@ class MADDPG:
             others_states, others_actions: Tensors for other agents
             target_actions: Predicted target actions of the current agent
             others_target_actions: Predicted target actions of other agents
+            num_tiles (int): Number of ghost agents added by the critic
         """
-        critic_value_ = agent.target_critic.forward(state, target_actions, others_states, others_target_actions)
-        critic_value = agent.critic.forward(state, action, others_states, others_actions)
+        with T.no_grad():
+            critic_value_ = agent.target_critic.forward(state, target_actions, others_states, others_target_actions,
+                                                        num_tiles)
+        critic_value = agent.critic.forward(state, action, others_states, others_actions, num_tiles)
 
-        target = []
-        for j in range(self.batch_size):
-            target.append(reward[j] + self.gamma * critic_value_[j])
-        target = T.tensor(target).to(agent.critic.device)
-        target = target.view(self.batch_size, 1)
+        target = (reward + self.gamma * critic_value_).detach()
 
-        agent.critic.train()
         agent.critic.optimizer.zero_grad()
         critic_loss = F.mse_loss(target, critic_value)
         critic_loss.backward()
         agent.critic.optimizer.step()
 
-    def _train_actor(self, agent, idx: int, state: T.tensor, others_states: T.tensor, flag: bool, num_tiles: int) -> None:
+    def _train_actor(self, agent, state: T.tensor, others_states: T.tensor, others_mus: T.tensor,
+                     num_tiles: int) -> None:
         """
         Trains the actor network of a given agent.
 
@@ -132,35 +151,27 @@ class MADDPG:
 
         Args:
             agent: Agent whose actor is being trained
-            idx (int): Index of the current agent
             state: Tensor of the agent's states
             others_states: Tensor of other agents' states
-            flag (bool): Whether to add ghost agents
-            num_tiles (int): Number of ghost agents
+            others_mus: Actions of the other agents for others_states
+            num_tiles (int): Number of ghost agents added by the critic
         """
-        agent.critic.eval()
         agent.actor.optimizer.zero_grad()
         mu = agent.actor.forward(state)
 
-        others_mus = self._get_others_actions(idx, others_states, network='target_actor')
-        if flag:
-            first_column_others_mus = others_mus[:, 0].unsqueeze(1)
-            tiled_others_mus = T.cat([first_column_others_mus] * num_tiles, dim=1)
-            others_mus = T.cat([others_mus, tiled_others_mus], dim=1)
-
-        agent.actor.train()
-        actor_loss = -agent.critic.forward(state, mu, others_states, others_mus)
+        actor_loss = -agent.critic.forward(state, mu, others_states, others_mus, num_tiles)
         actor_loss = T.mean(actor_loss)
         actor_loss.backward()
         agent.actor.optimizer.step()
         agent.update_network_parameters()
 
-    def _learn_from_memory(self, memory, idx: int, flag: bool, num_tiles: int) -> None:
+    def _learn_from_memory(self, memory, agent, idx: int, flag: bool, num_tiles: int) -> None:
         """
         Executes one learning step using the given memory buffer.
 
         Args:
             memory: Replay buffer (long or short)
+            agent: Agent being trained
             idx (int): Index of the agent being trained
             flag (bool): Whether to include ghost agents
             num_tiles (int): Number of ghost agents to add
@@ -168,60 +179,51 @@ class MADDPG:
         if memory.mem_cntr < self.batch_size:
             return
 
-        agent = self.agents[idx]
-        device = agent.critic.device
-
         state, action, reward, others_states, others_actions = memory.sample_buffer(self.batch_size)
-        state = T.tensor(state, dtype=T.float).to(device)
-        action = T.tensor(action, dtype=T.float).to(device)
-        reward = T.tensor(reward, dtype=T.float).to(device)
 
-        if flag:
-            others_states = self._create_ghosts(others_states, num_tiles)
-            others_actions = self._create_ghosts(others_actions, num_tiles)
+        # Ghost agents are added inside the critic, which replicates the first other agent
+        if not flag:
+            num_tiles = 0
 
-        others_states = T.tensor(others_states, dtype=T.float).to(device)
-        others_actions = T.tensor(others_actions, dtype=T.float).to(device)
+        with T.no_grad():
+            target_actions = agent.target_actor.forward(state)
 
-        agent.target_actor.eval()
-        agent.target_critic.eval()
-        agent.critic.eval()
-
-        target_actions = agent.target_actor.forward(state)
-
-        others_target_actions = self._get_others_actions(idx, others_states, network='target_actor')
-        if flag:
-            first_column = others_target_actions[:, 0].unsqueeze(1)
-            tiled = T.cat([first_column] * num_tiles, dim=1)
-            others_target_actions = T.cat([others_target_actions, tiled], dim=1)
+            others_target_actions = self._get_others_actions(idx, others_states, network='target_actor')
 
         self._train_critic(agent, state, action, reward, others_states, others_actions,
-                           target_actions, others_target_actions)
+                           target_actions, others_target_actions, num_tiles)
 
-        self._train_actor(agent, idx, state, others_states, flag, num_tiles)
+        # The actor loss evaluates the other agents with their target policies, not their current ones
+        # as in the MADDPG paper. This keeps the trained behaviour unchanged and lets the loss reuse
+        # the target actions above instead of running the other agents' actors again.
+        self._train_actor(agent, state, others_states, others_target_actions, num_tiles)
 
     def remember(self, state: T.tensor, action: T.tensor, reward: T.tensor, others_states: T.tensor, 
                  others_actions: T.tensor) -> None:
         """
-        Stores a transition in both long-term and short-term memory buffers.
+        Stores a transition in the long-term memory buffer and, if enabled, in the short-term one.
 
         Args:
             state, action, reward: Agent's transition tuple
             others_states, others_actions: Transitions of the other agents
         """
         self.memory.store_transition(state, action, reward, others_states, others_actions)
-        self.short_memory.store_transition(state, action, reward, others_states, others_actions)
+        if self.use_short_memory:
+            self.short_memory.store_transition(state, action, reward, others_states, others_actions)
 
     def learn(self, idx: int, flag: bool=False, num_tiles: int=3) -> None:
         """
         Performs a learning step for the agent with index `idx`.
 
-        Uses both the long-term and short-term memory buffers.
+        Uses the long-term memory buffer and, if enabled, the short-term one. The short-term
+        buffer holds only the latest transition, so its update replays it as a whole batch.
 
         Args:
             idx (int): Index of the agent being trained
             flag (bool): Whether to use ghost agents
             num_tiles (int): Number of ghost agents to add
         """
-        self._learn_from_memory(self.memory, idx, flag, num_tiles)
-        self._learn_from_memory(self.short_memory, idx, flag, num_tiles)
\ No newline at end of file
+        agent = self.agents[idx]
+        self._learn_from_memory(self.memory, agent, idx, flag, num_tiles)
+        if self.use_short_memory:
+            self._learn_from_memory(self.short_memory, agent, idx, flag, num_tiles)
\ No newline at end of file
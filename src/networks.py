@@ -1,5 +1,5 @@
 import os
-import numpy as np
+import math
 import torch as T
 import torch.nn as nn
 import torch.optim as optim
@@ -20,7 +20,6 @@ class Network(nn.Module):
         super(Network, self).__init__()
         self.checkpoint_file = os.path.join(chkpt_dir, name)
         self.device = T.device('cuda:0' if T.cuda.is_available() else 'cpu')
-        self.to(self.device)
         self.type = ''
 
     def save_checkpoint(self, name: str) -> None:
@@ -77,13 +76,39 @@ class CriticNetwork(Network):
         self.type = 'critic'
         shape_of_input = n_agents*(input_dims + n_actions)
         if flag: shape_of_input = (n_agents + extra)*(input_dims + n_actions)
+        n_others = shape_of_input // (input_dims + n_actions) - 1
+
+        # Column where each input block (state, action, others_states, others_actions) ends in fc1's weight
+        self.state_end = input_dims
+        self.action_end = self.state_end + n_actions
+        self.others_states_end = self.action_end + n_others*input_dims
 
         self.fc1 = nn.Linear(shape_of_input, fc1_dims)
         self.fc2 = nn.Linear(fc1_dims, fc2_dims)
         self.q = nn.Linear(fc2_dims, 1)
+        self.to(self.device)
         self.optimizer = optim.Adam(self.parameters(), lr=beta)
 
-    def forward(self, state: T.Tensor, action: T.Tensor, others_states: T.Tensor, others_actions: T.Tensor) -> T.Tensor:
+    def _add_others(self, x: T.Tensor, others: T.Tensor, weight: T.Tensor, num_tiles: int) -> T.Tensor:
+        """
+        Add the contribution of the other agents' inputs, and of their ghost copies, to the first layer.
+
+        Ghost agents repeat the first other agent, so instead of tiling that column num_tiles times
+        its weight columns are summed and applied to it once.
+
+        Raises:
+            ValueError: If the other agents and ghosts do not match the critic's input width.
+        """
+        n_others = others.shape[1]
+        if n_others + num_tiles != weight.shape[1]:
+            raise ValueError(f"Critic expects {weight.shape[1]} other-agent columns, got {n_others} plus {num_tiles} ghosts.")
+        x.addmm_(others, weight[:, :n_others].t())
+        if num_tiles:
+            x.addmm_(others[:, :1], weight[:, n_others:n_others + num_tiles].sum(dim=1, keepdim=True).t())
+        return x
+
+    def forward(self, state: T.Tensor, action: T.Tensor, others_states: T.Tensor, others_actions: T.Tensor,
+                num_tiles: int = 0) -> T.Tensor:
         """
         Perform the forward pass through the critic network.
         
@@ -92,12 +117,18 @@ class CriticNetwork(Network):
             action (T.Tensor): The action taken by the agent.
             others_states (T.Tensor): States of other agents in the environment.
             others_actions (T.Tensor): Actions taken by other agents.
+            num_tiles (int, optional): Number of ghost agents replicating the first other agent. Defaults is 0.
             
         Returns:
             T.Tensor: The estimated Q-value for the given state-action combination.
         """
-        concatenated_inputs  = T.cat([state, action, others_states, others_actions], dim=1)
-        x = F.relu(self.fc1(concatenated_inputs))
+        # Same as fc1 over the concatenated inputs, without materializing the concatenation
+        weight = self.fc1.weight
+        x = F.linear(state, weight[:, :self.state_end], self.fc1.bias)
+        x.addmm_(action, weight[:, self.state_end:self.action_end].t())
+        x = self._add_others(x, others_states, weight[:, self.action_end:self.others_states_end], num_tiles)
+        x = self._add_others(x, others_actions, weight[:, self.others_states_end:], num_tiles)
+        x = F.relu(x)
         x = F.relu(self.fc2(x))
         q_value = self.q(x)
         return q_value
@@ -139,19 +170,21 @@ class ActorNetwork(Network):
 
         self._init_layer(self.fc1)
         self._init_layer(self.fc2)
-        self._init_layer(self.mu, scale=0.003)
+        self._init_layer(self.mu, limit=0.003)
+        self.to(self.device)
         self.optimizer = optim.Adam(self.parameters(), lr=alpha)
 
-    def _init_layer(self, layer: nn.Linear, scale: float = 1.0) -> None:
+    def _init_layer(self, layer: nn.Linear, limit: float | None = None) -> None:
         """
         Initialize the weights and biases of the network layers.
-        Uses uniform distribution with calculated scaling factors based on
-        the size of each layer.
-        """
-        fan_in = layer.weight.data.size()[0]
-        limit = scale / np.sqrt(fan_in)
-        T.nn.init.uniform_(layer.weight.data, -limit, limit)
-        T.nn.init.uniform_(layer.bias.data, -limit, limit)
+        Uses uniform distribution in [-limit, limit]. Hidden layers leave limit unset and
+        get 1/sqrt(fan_in) from their number of inputs (weights are stored as out x in),
+        while the output layer is given a small fixed limit, as in DDPG.
+        """
+        if limit is None:
+            limit = 1 / math.sqrt(layer.weight.size(1))
+        nn.init.uniform_(layer.weight, -limit, limit)
+        nn.init.uniform_(layer.bias, -limit, limit)
 
     def forward(self, state: T.Tensor) -> T.Tensor:
         """
@@ -165,4 +198,38 @@ class ActorNetwork(Network):
         """
         x = F.relu(self.fc1(state))
         x = F.relu(self.fc2(x))
-        return T.sigmoid(self.mu(x))
\ No newline at end of file
+        return T.sigmoid(self.mu(x))
+
+    @staticmethod
+    def block_diagonal_layers(actors: list) -> list:
+        """
+        Combine the layers of several actors into block-diagonal layers, so that a single
+        forward runs every actor on its own columns of the input. Built without gradients.
+        
+        Args:
+            actors (list): Actor networks with the same architecture.
+            
+        Returns:
+            list: The (weight, bias) of each combined layer.
+        """
+        actors = [getattr(actor, '_orig_mod', actor) for actor in actors]
+        with T.no_grad():
+            return [(T.block_diag(*[layer.weight for layer in layers]), T.cat([layer.bias for layer in layers]))
+                    for layers in zip(*[(actor.fc1, actor.fc2, actor.mu) for actor in actors])]
+
+    @staticmethod
+    def block_diagonal_forward(layers: list, states: T.Tensor) -> T.Tensor:
+        """
+        Perform the forward pass through actors combined by block_diagonal_layers.
+        
+        Args:
+            layers (list): The combined layers.
+            states (T.Tensor): States of every actor, concatenated in the order the actors were combined.
+            
+        Returns:
+            T.Tensor: Actions of every actor, concatenated in the same order.
+        """
+        (fc1_weight, fc1_bias), (fc2_weight, fc2_bias), (mu_weight, mu_bias) = layers
+        x = F.relu(F.linear(states, fc1_weight, fc1_bias))
+        x = F.relu(F.linear(x, fc2_weight, fc2_bias))
+        return T.sigmoid(F.linear(x, mu_weight, mu_bias))
\ No newline at end of file
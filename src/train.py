@@ -3,26 +3,27 @@ import random
 import shutil
 import timeit
 import numpy as np
+import torch as T
 from utils import *
 from datetime import timedelta
 from gui import show_auction_episode
 
-def get_others_states_actions(observations: list, actions: list, idx: int) -> tuple:
+def get_others_states_actions(observations: np.ndarray, actions: np.ndarray, idx: int) -> tuple:
     """
     Extract the observations and actions of all agents except the one at the given index.
 
     Args:
-        observations (list): List of observations for all agents.
-        actions (list): List of actions taken by all agents.
+        observations (np.ndarray): Observations for all agents.
+        actions (np.ndarray): Actions taken by all agents.
         idx (int): Index of the agent to exclude.
 
     Returns:
         tuple: A tuple containing:
-            - list: Observations of all other agents.
-            - list: Actions of all other agents.
+            - np.ndarray: Observations of all other agents.
+            - np.ndarray: Actions of all other agents.
     """
-    others_observations = observations[:idx] + observations[idx+1:]
-    others_actions = actions[:idx] + actions[idx+1:]
+    others_observations = np.delete(observations, idx)
+    others_actions = np.delete(actions, idx)
     return others_observations, others_actions
 
 def generate_grid_actions(grid_N: int, max_revenue: float) -> list:
@@ -39,6 +40,41 @@ def generate_grid_actions(grid_N: int, max_revenue: float) -> list:
     grid_values = np.linspace(0, 0.9, grid_N)
     return [val + random.uniform(0, max_revenue / grid_N) for val in grid_values]
 
+def probe_grid_rewards(env, batched_env, observations: np.ndarray, actions: np.ndarray,
+                       grid_actions: np.ndarray, r: float, t: float):
+    """
+    Compute the reward each agent would get for each of its grid bids, with the other agents' bids fixed.
+
+    Args:
+        env (AuctionEnv): Auction environment instance, used when no batched environment is given.
+        batched_env (BaseBatchedAuctionEnv): Batched version of env, or None.
+        observations (np.ndarray): Observations for all agents.
+        actions (np.ndarray): Bids submitted by all agents.
+        grid_actions (np.ndarray): Grid bids of each agent, with shape (N, grid_N).
+        r (float): Reward shaping parameter.
+        t (float): Fraction of the bid paid by the losers in partial all-pay auctions.
+
+    Returns:
+        np.ndarray or T.Tensor: Rewards with shape (N, grid_N), on the batched environment's device if given.
+    """
+    N, grid_N = grid_actions.shape
+    agents_idx = np.arange(N)
+    bids = np.tile(actions, (N, grid_N, 1))
+    bids[agents_idx, :, agents_idx] = grid_actions
+
+    if batched_env is None:
+        rewards = np.empty((N, grid_N), dtype=np.float32)
+        for idx in range(N):
+            for k in range(grid_N):
+                rewards[idx, k] = env.step(observations, bids[idx, k], r, t)[idx]
+        return rewards
+
+    # Every probe is an independent auction, so all of them run as one batch
+    values = T.from_numpy(observations).to(batched_env.device).expand(N * grid_N, N)
+    bids = T.from_numpy(bids.reshape(N * grid_N, N)).to(batched_env.device)
+    rewards = batched_env.step(values, bids, r, t).view(N, grid_N, N)
+    return rewards[agents_idx, :, agents_idx]
+
 def log_episode(ep: int, obs: list, actions: list, rewards: list, show_gui: bool=True) -> None:
     """
     Print the values, bids, and rewards of a given episode.
@@ -99,7 +135,8 @@ def MAtrainLoop(maddpg,
                 save_interval: int=10,
                 tl_flag: bool=False, 
                 extra_players: int=2,
-                show_gui: bool=False):
+                show_gui: bool=False,
+                batched_env=None):
     """
     Multi-agent training loop for auction environments using MADDPG.
 
@@ -115,8 +152,11 @@ def MAtrainLoop(maddpg,
         save_interval (int): Interval (in episodes) at which to log and save models.
         tl_flag (bool): Whether to enable transfer learning.
         extra_players (int): Number of hypothetical agents for extended learning.
+        batched_env (BaseBatchedAuctionEnv, optional): Batched version of env used to probe the grid bids.
     """
+    random.seed(0)
     np.random.seed(0)
+    T.manual_seed(0)
     start_time = timeit.default_timer()
     
     agents = maddpg.agents
@@ -126,25 +166,27 @@ def MAtrainLoop(maddpg,
 
     for ep in range(n_episodes):
         observations = env.reset()
-        original_actions = [agents[i].choose_action(observations[i], ep)[0] for i in range(N)]
-        original_rewards = env.step(observations, original_actions, r, t)
+        original_actions = np.array([agents[i].choose_action(observations[i], ep)[0] for i in range(N)], dtype=np.float32)
+        original_rewards = env.step(observations, original_actions, r, t).copy()
 
         batch_loss = []
 
+        # The probed rewards do not depend on learning, so they are all computed up front
+        grid_actions = np.array([generate_grid_actions(grid_N, max_revenue) for _ in range(N)], dtype=np.float32)
+        grid_rewards = probe_grid_rewards(env, batched_env, observations, original_actions, grid_actions, r, t)
+
         for idx in range(N):
             others_obs, others_actions = get_others_states_actions(observations, original_actions, idx)
-            grid_actions = generate_grid_actions(grid_N, max_revenue)
 
-            for new_action in grid_actions:
-                test_actions = original_actions[:idx] + [new_action] + original_actions[idx+1:]
-                rewards = env.step(observations, test_actions, r, t)
-                maddpg.remember(observations[idx], test_actions[idx], rewards[idx], others_obs, others_actions)
+            for k, new_action in enumerate(grid_actions[idx]):
+                maddpg.remember(observations[idx], new_action, grid_rewards[idx, k], others_obs, others_actions)
                 loss = maddpg.learn(idx, flag=(tl_flag if extra_players > 0 else False), num_tiles=extra_players)
                 if loss is not None:
                     batch_loss.append(loss)
                     
         if ep % save_interval == 0:
-            log_episode(ep, observations, original_actions, original_rewards, show_gui)
+            # The GUI reads the values on another thread, after the next reset has reused the array
+            log_episode(ep, observations.copy(), original_actions, original_rewards, show_gui)
 
             hist = manualTesting(agents, N, ep, n_episodes, auc_type=auction_type, r=r, t=t,
                                  max_revenue=max_revenue, gam=gam)
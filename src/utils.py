@@ -115,7 +115,7 @@ def calculate_agents_actions(agents: list, N: int, episode: int, auc_type: str,
     agents_actions = []
 
     for k, agent in enumerate(agents):
-        actions = [agent.choose_action(state, episode, evaluation=1)[0] for state in states] 
+        actions = agent.choose_actions_batched(states, episode, evaluation=True)[:, 0].tolist()
         agents_actions.append(actions)
         expected_action = calculate_expected_action(N, auc_type, states, r, t, max_revenue, gam)
         agent_error = np.mean(np.abs(np.array(actions) - np.array(expected_action)))